@@ -0,0 +1,125 @@
+import zlib
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+# --- HELPER: DETERMINISTIC RANDOMNESS PER TICKER ---
+def _rng(ticker, salt=""):
+    return np.random.default_rng(zlib.crc32(f"{ticker}{salt}".encode()))
+
+def _price_walk(ticker, n, start_price=None):
+    rng = _rng(ticker)
+    start = start_price or rng.uniform(50, 500)
+    returns = rng.normal(0.0004, 0.018, n)
+    close = start * np.exp(np.cumsum(returns))
+    spread = np.abs(rng.normal(0, 0.01, n)) * close
+    return pd.DataFrame({
+        "Open": close - spread / 2,
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 50_000_000, n),
+    })
+
+# --- FAKE yf.download ---
+def fake_download(tickers, start=None, end=None, period=None, interval="1d", group_by="column", history_days=None, **kwargs):
+    # Home grid: 5 days of 5m bars for the whole watchlist, grouped by ticker
+    if isinstance(tickers, (list, tuple)):
+        index = pd.date_range(end=pd.Timestamp("today").normalize(), periods=5 * 78, freq="5min")
+        frames = {}
+        for ticker in tickers:
+            df = _price_walk(ticker, len(index))
+            df.index = index
+            frames[ticker] = df
+        return pd.concat(frames, axis=1)
+
+    # Analysis page: daily history for one ticker
+    start = pd.to_datetime(start) if start is not None else pd.Timestamp("2015-01-01")
+    end = pd.to_datetime(end) if end is not None else pd.Timestamp("today")
+    index = pd.bdate_range(start, end)
+    if history_days:
+        index = index[-history_days:]
+    df = _price_walk(tickers, len(index))
+    df.index = index
+    df.index.name = "Date"
+    return df
+
+# --- FAKE yf.Ticker ---
+class FakeTicker:
+    def __init__(self, ticker, *args, **kwargs):
+        self.ticker = ticker
+
+    def _report_dates(self, n, salt):
+        rng = _rng(self.ticker, salt)
+        offsets = rng.integers(5, 400, n)
+        return [pd.Timestamp("today").normalize() - pd.Timedelta(days=int(d)) for d in offsets]
+
+    @property
+    def institutional_holders(self):
+        rng = _rng(self.ticker, "inst")
+        names = ["Vanguard Group Inc", "Blackrock Inc.", "State Street Corporation", "FMR, LLC", "Geode Capital Management"]
+        return pd.DataFrame({
+            "Date Reported": self._report_dates(len(names), "inst"),
+            "Holder": names,
+            "pctHeld": rng.uniform(0.01, 0.09, len(names)),
+            "Shares": rng.integers(10_000_000, 900_000_000, len(names)),
+            "Value": rng.integers(1_000_000_000, 90_000_000_000, len(names)),
+        })
+
+    @property
+    def mutualfund_holders(self):
+        rng = _rng(self.ticker, "mf")
+        names = ["Vanguard Total Stock Market Index Fund", "Vanguard 500 Index Fund", "Fidelity 500 Index Fund", "SPDR S&P 500 ETF Trust"]
+        return pd.DataFrame({
+            "Date Reported": self._report_dates(len(names), "mf"),
+            "Holder": names,
+            "pctHeld": rng.uniform(0.005, 0.04, len(names)),
+            "Shares": rng.integers(1_000_000, 400_000_000, len(names)),
+            "Value": rng.integers(100_000_000, 40_000_000_000, len(names)),
+        })
+
+    @property
+    def insider_transactions(self):
+        rng = _rng(self.ticker, "insider")
+        insiders = ["COOK TIMOTHY D", "MAESTRI LUCA", "WILLIAMS JEFFREY E", "ADAMS KATHERINE L", "O'BRIEN DEIRDRE"]
+        texts = ["Sale at price 180.00 - 185.00 per share.", "Stock Award(Grant) at price 0.00 per share.", "Sale at price 170.50 per share."]
+        n = 8
+        return pd.DataFrame({
+            "Shares": rng.integers(1_000, 500_000, n),
+            "Value": rng.integers(100_000, 90_000_000, n),
+            "Text": [texts[i % len(texts)] for i in range(n)],
+            "Insider": [insiders[i % len(insiders)] for i in range(n)],
+            "Position": "Officer",
+            "Start Date": self._report_dates(n, "insider"),
+            "Ownership": "D",
+        })
+
+# --- INSTALL / REMOVE PATCHES ---
+_ORIGINALS = {}
+
+def install(history_days=None):
+    """Route yfinance through the offline fixtures so load tests never hit the network."""
+    if _ORIGINALS:
+        if _ORIGINALS["history_days"] != history_days:
+            raise RuntimeError(
+                f"fixtures already installed with history_days={_ORIGINALS['history_days']}; "
+                "call uninstall() before installing with a different value"
+            )
+        return
+    _ORIGINALS["history_days"] = history_days
+    _ORIGINALS["download"] = yf.download
+    _ORIGINALS["Ticker"] = yf.Ticker
+
+    def download(*args, **kwargs):
+        kwargs.setdefault("history_days", history_days)
+        return fake_download(*args, **kwargs)
+
+    yf.download = download
+    yf.Ticker = FakeTicker
+
+def uninstall():
+    if not _ORIGINALS:
+        return
+    yf.download = _ORIGINALS["download"]
+    yf.Ticker = _ORIGINALS["Ticker"]
+    _ORIGINALS.clear()
@@ -0,0 +1,396 @@
+"""Concurrent-session load test for the NeuroStock Streamlit app.
+
+Drives app.py headlessly through Streamlit's AppTest API against the offline
+fixtures in loadtest/fixtures.py, so no request ever reaches Yahoo Finance.
+
+Each simulated session follows a realistic flow: open the home grid, click
+"Analyze" on a card, check the tabs rendered, flip through the holder views,
+optionally start LSTM training, then go back home. N sessions run at once in
+one process (the same way `streamlit run` serves users on threads) and the
+report shows page throughput, p50/p95/p99 page latency and the peak RSS
+growth per level. Training reruns are reported on their own line so their
+minutes of model fitting don't swamp the page-latency figures.
+
+Before the first level one untimed home -> Analyze -> Back pass warms the
+process up (imports of keras/matplotlib, the shared runtime, the home-grid
+cache), so the N=1 baseline measures serving rather than start-up. If that
+pass fails the app can't be served at all and the run stops there.
+
+The fixture history defaults to the production shape (2015-01-01 to today,
+about 2,800 trading days). --history-days 250 is a quicker opt-in mode; the
+report says so when it is used, since page and especially training figures
+are understated on the shorter series.
+
+Failed flows are counted once and split into three kinds:
+    app      the app rendered an exception or st.error, or a page was missing;
+             such error pages are counted apart and kept out of pages/s and
+             the latency percentiles
+    timeout  a rerun exceeded --timeout / --train-timeout (its elapsed time
+             still counts towards the latency percentiles)
+    harness  the harness itself broke, e.g. an expected widget wasn't found
+The command exits non-zero on any harness failure, or when the failed-flow
+ratio of any level exceeds --max-failure-ratio.
+
+Known app-side issue: keras auto-names layers from a process-global counter
+that isn't thread-safe, so two sessions training at the same moment can fail
+with "All layers added to a Sequential model should have unique names".
+These show up as app failures when --train-ratio > 0 and N > 1.
+
+Usage:
+    python -m loadtest.harness
+    python -m loadtest.harness --sessions 1,2,4,8 --train-ratio 0.25 --json report.json
+    python -m loadtest.harness --sessions 4 --history-days 250   # quick, truncated data
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+# app.py imports `templates.*` relative to the repo root
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import matplotlib
+matplotlib.use("Agg")
+
+from streamlit.runtime import Runtime
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.util import patch_config_options
+
+from loadtest import fixtures
+
+# templates/analysis.py trains on the first 70% of rows using 100-day windows,
+# so anything shorter leaves x_train empty and the LSTM build fails.
+MIN_HISTORY_DAYS = 145
+
+# --- HELPER: ONE RUNTIME PER PROCESS ---
+def _share_runtime():
+    # AppTest installs a fresh mock Runtime for every run and clears it when
+    # the run finishes, which breaks any other session still mid-run. Pin the
+    # first one so concurrent sessions share a runtime, like a real server.
+    # Returns a callable that puts the original classmethods back.
+    pinned = []
+    lock = threading.Lock()
+    original_instance = Runtime.__dict__["instance"]
+    original_exists = Runtime.__dict__["exists"]
+
+    def instance(cls):
+        if pinned:
+            return pinned[0]
+        with lock:
+            if not pinned:
+                pinned.append(original_instance.__func__(cls))
+        return pinned[0]
+
+    def exists(cls):
+        return bool(pinned) or cls._instance is not None
+
+    def restore():
+        Runtime.instance = original_instance
+        Runtime.exists = original_exists
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+    return restore
+
+# --- HELPER: MEMORY SAMPLING ---
+def current_rss_bytes():
+    # Needs procfs; returns None elsewhere rather than a lifetime peak that
+    # can't be attributed to a single level.
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+class RssSampler(threading.Thread):
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.baseline = current_rss_bytes()
+        self.peak = self.baseline
+        self._stop_event = threading.Event()
+
+    def _sample(self):
+        rss = current_rss_bytes()
+        if rss is not None:
+            self.peak = max(self.peak, rss)
+
+    def run(self):
+        if self.baseline is None:
+            return
+        while not self._stop_event.is_set():
+            self._sample()
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        if self.baseline is not None:
+            self._sample()
+
+# --- SIMULATED USER SESSION ---
+class StepFailed(Exception):
+    def __init__(self, kind, step, message):
+        super().__init__(f"{step}: {message}")
+        self.kind = kind
+
+class Session:
+    def __init__(self, session_id, args, rng):
+        self.session_id = session_id
+        self.args = args
+        self.rng = rng
+        self.timings = []  # (step, seconds)
+        self.error_pages = []  # (step, seconds) for reruns that rendered an error
+        self.flows = 0
+        self.failures = []  # (kind, message), at most one per flow
+        self.at = self._new_app()
+
+    def _new_app(self):
+        return AppTest.from_file(APP_PATH, default_timeout=self.args.timeout)
+
+    def _timed(self, step, action):
+        t0 = time.perf_counter()
+        try:
+            action()
+        except RuntimeError as e:
+            if "timed out" not in str(e):
+                raise StepFailed("harness", step, f"{type(e).__name__}: {e}")
+            # A timeout is the slowest request of all: keep it in the percentiles
+            self.timings.append((step, time.perf_counter() - t0))
+            raise StepFailed("timeout", step, str(e))
+        except Exception as e:
+            raise StepFailed("harness", step, f"{type(e).__name__}: {e}")
+        elapsed = time.perf_counter() - t0
+
+        problems = [ex.message for ex in self.at.exception] + [err.value for err in self.at.error]
+        if problems:
+            self.error_pages.append((step, elapsed))
+            raise StepFailed("app", step, problems[0])
+        self.timings.append((step, elapsed))
+
+    def _button(self, label):
+        for button in self.at.button:
+            if button.label == label:
+                return button
+        raise LookupError(f"button {label!r} not rendered")
+
+    def run_flow(self, train):
+        at = self.at
+        self._timed("home", at.run)
+
+        analyze_keys = [b.key for b in at.button if (b.key or "").startswith("btn_")]
+        if not analyze_keys:
+            raise StepFailed("app", "home", "no Analyze buttons rendered")
+        key = self.rng.choice(analyze_keys)
+        self._timed("analyze", lambda: at.button(key=key).click().run())
+
+        # Tabs switch client-side without a rerun, so all the server can be
+        # held to is having sent every tab with content in it.
+        if not at.tabs or any(not tab.children for tab in at.tabs):
+            raise StepFailed("app", "tabs", "analysis tabs did not render")
+        if not at.selectbox:
+            raise StepFailed("app", "holder_view", "holder view selectbox not rendered")
+
+        options = at.selectbox[0].options
+        views = self.rng.sample(options, k=self.rng.randint(1, len(options)))
+        for view in views:
+            self._timed("holder_view", lambda: at.selectbox[0].set_value(view).run())
+
+        if train:
+            self._timed("train", lambda: self._button("Start LSTM Training").click().run(timeout=self.args.train_timeout))
+
+        self._timed("back", lambda: self._button("← Back").click().run())
+
+    def warm_up(self):
+        self.run_flow(train=False)
+
+    def run(self, barrier):
+        barrier.wait()
+        for _ in range(self.args.iterations):
+            self.flows += 1
+            try:
+                self.run_flow(train=self.rng.random() < self.args.train_ratio)
+            except StepFailed as e:
+                self.failures.append((e.kind, str(e)))
+                # The flow may have died on the analysis page before "Back";
+                # start the next one from a clean home grid.
+                self.at = self._new_app()
+
+# --- ONE CONCURRENCY LEVEL ---
+def percentile(values, q):
+    # None rather than NaN for an empty series: NaN isn't valid JSON
+    return float(np.percentile(values, q)) * 1000 if values else None
+
+def latency_summary(values):
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+    }
+
+def _mb(n_bytes):
+    return n_bytes / (1024 * 1024) if n_bytes is not None else None
+
+def run_level(n_sessions, args):
+    sessions = [Session(i, args, random.Random(args.seed * 1000 + i)) for i in range(n_sessions)]
+    barrier = threading.Barrier(n_sessions + 1)
+    threads = [threading.Thread(target=s.run, args=(barrier,), name=f"session-{s.session_id}") for s in sessions]
+
+    sampler = RssSampler()
+    sampler.start()
+    for t in threads:
+        t.start()
+    barrier.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    sampler.stop()
+
+    by_step = defaultdict(list)
+    for s in sessions:
+        for step, sec in s.timings:
+            by_step[step].append(sec)
+    page_latencies = [sec for step, values in by_step.items() if step != "train" for sec in values]
+
+    error_pages = [sec for s in sessions for _, sec in s.error_pages]
+
+    flows = sum(s.flows for s in sessions)
+    failures = [f for s in sessions for f in s.failures]
+    failure_counts = {kind: sum(1 for k, _ in failures if k == kind) for kind in ("app", "timeout", "harness")}
+
+    rss_growth = None
+    if sampler.baseline is not None:
+        rss_growth = sampler.peak - sampler.baseline
+
+    return {
+        "sessions": n_sessions,
+        "history_days": args.history_days or None,
+        "flows": flows,
+        "failed_flows": failure_counts,
+        "failure_ratio": len(failures) / flows if flows else 0.0,
+        "failure_samples": [msg for _, msg in failures[:5]],
+        "wall_s": wall,
+        "pages": len(page_latencies),
+        "throughput_pps": len(page_latencies) / wall if wall else 0.0,
+        "page_latency": latency_summary(page_latencies),
+        "train_latency": latency_summary(by_step.get("train", [])),
+        "error_pages": latency_summary(error_pages),
+        "rss_baseline_mb": _mb(sampler.baseline),
+        "rss_growth_mb": _mb(rss_growth),
+        "steps": {step: latency_summary(v) for step, v in sorted(by_step.items())},
+    }
+
+# --- REPORTING ---
+def _fmt(value):
+    return f"{value:.1f}" if value is not None else "n/a"
+
+def print_report(results, args):
+    if args.history_days:
+        print(f"NOTE: fixture history truncated to {args.history_days} trading days; "
+              "production loads 2015-today, so latency and training cost are understated.\n")
+
+    header = (f"{'sessions':>8} {'flows':>6} {'app':>4} {'t/o':>4} {'hrn':>4} {'pages':>6} {'err pg':>6} {'pages/s':>8} "
+              f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'RSS base MB':>12} {'RSS +peak MB':>13}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        f, p = r["failed_flows"], r["page_latency"]
+        print(f"{r['sessions']:>8} {r['flows']:>6} {f['app']:>4} {f['timeout']:>4} {f['harness']:>4} {r['pages']:>6} "
+              f"{r['error_pages']['count']:>6} {r['throughput_pps']:>8.2f} {_fmt(p['p50_ms']):>9} {_fmt(p['p95_ms']):>9} "
+              f"{_fmt(p['p99_ms']):>9} {_fmt(r['rss_baseline_mb']):>12} {_fmt(r['rss_growth_mb']):>13}")
+    print("(app / t/o / hrn = failed flows by kind; pages, pages/s and latency exclude training reruns and error pages)")
+
+    for r in results:
+        print(f"\n[{r['sessions']} sessions] per-step latency")
+        for step, s in r["steps"].items():
+            print(f"  {step:<12} n={s['count']:<5} p50={_fmt(s['p50_ms'])}ms p95={_fmt(s['p95_ms'])}ms p99={_fmt(s['p99_ms'])}ms")
+        if r["failure_ratio"] > args.max_failure_ratio:
+            print(f"  FAILED: {r['failure_ratio']:.0%} of flows failed (limit {args.max_failure_ratio:.0%})")
+        for msg in r["failure_samples"]:
+            print(f"  failure: {msg}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test app.py with N concurrent headless sessions.")
+    parser.add_argument("--sessions", default="1,2,4,8", help="Comma-separated concurrency levels to run, e.g. 1,2,4,8")
+    parser.add_argument("--iterations", type=int, default=3, help="Flows each session runs per level")
+    parser.add_argument("--train-ratio", type=float, default=0.0, help="Fraction of flows that click 'Start LSTM Training'")
+    parser.add_argument("--history-days", type=int, default=0,
+                        help=f"Truncate fixture price history to this many trading days (min {MIN_HISTORY_DAYS}); "
+                             "default 0 keeps the full 2015-today range the app loads in production")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-rerun timeout in seconds")
+    parser.add_argument("--train-timeout", type=float, default=300, help="Timeout in seconds for the training rerun")
+    parser.add_argument("--cold-cache", action="store_true", help="Clear st.cache_data before each level")
+    parser.add_argument("--max-failure-ratio", type=float, default=0.1,
+                        help="Exit non-zero if more than this fraction of a level's flows fail")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="Also write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        args.levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+    except ValueError:
+        parser.error(f"--sessions must be a comma-separated list of integers, got {args.sessions!r}")
+    if not args.levels or min(args.levels) < 1:
+        parser.error("--sessions levels must all be at least 1")
+    if args.iterations < 1:
+        parser.error("--iterations must be at least 1")
+    if args.history_days < 0:
+        parser.error("--history-days must not be negative")
+    if args.history_days and args.history_days < MIN_HISTORY_DAYS:
+        parser.error(f"--history-days must be 0 or at least {MIN_HISTORY_DAYS} (the LSTM needs 100-day windows in its 70% training split)")
+    if not 0 <= args.train_ratio <= 1:
+        parser.error("--train-ratio must be between 0 and 1")
+    if not 0 <= args.max_failure_ratio <= 1:
+        parser.error("--max-failure-ratio must be between 0 and 1")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    import streamlit as st
+
+    fixtures.install(history_days=args.history_days or None)
+    restore_runtime = _share_runtime()
+    try:
+        results = []
+        # Keep config patched for the whole run so per-run patches nest cleanly across threads
+        with patch_config_options({"global.appTest": True}):
+            # Untimed pass: pays the one-off imports and pins the shared
+            # runtime on a single thread before any level is measured.
+            print("Warming up...", file=sys.stderr)
+            try:
+                Session(-1, args, random.Random(args.seed)).warm_up()
+            except StepFailed as e:
+                print(f"Warm-up failed, app cannot be served: {e}", file=sys.stderr)
+                return 1
+            for n in args.levels:
+                if args.cold_cache:
+                    st.cache_data.clear()
+                print(f"Running {n} concurrent session(s)...", file=sys.stderr)
+                results.append(run_level(n, args))
+    finally:
+        restore_runtime()
+        fixtures.uninstall()
+
+    print_report(results, args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, allow_nan=False)
+
+    failed = any(r["failed_flows"]["harness"] or r["failure_ratio"] > args.max_failure_ratio for r in results)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())